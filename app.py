@@ -76,6 +76,7 @@ def init_components():
             db = DatabaseManager(database_url)
             if not db.test_connection():
                 raise Exception("Failed database connection test")
+            db.apply_migrations()
                 
             predictor = SalesPredictor()
             visualizer = DashboardVisualizer()
@@ -121,9 +122,6 @@ if page == "Dashboard":
     st.title("Dashboard Principal")
     
     try:
-        # Inicializar visualizador
-        visualizer = DashboardVisualizer()
-        
         # Cargar datos del dashboard
         low_stock, recent_sales, metrics = db.load_dashboard_data()
         
@@ -263,37 +261,37 @@ if page == "Dashboard":
 
         # Sistema de Alertas
         alertas = db.get_alerts()
-        if any(len(alerts) > 0 for alerts in alertas.values()):
+        if any(not alerts.empty for alerts in alertas.values()):
             st.subheader("Alertas Activas")
             
             col1, col2 = st.columns(2)
             with col1:
-                if alertas['critical']:
+                if not alertas['critical'].empty:
                     with st.expander("🚨 Alertas Críticas", expanded=True):
-                        for alerta in alertas['critical']:
+                        for alerta in alertas['critical'].itertuples(index=False):
                             st.error(
-                                f"**{alerta['tipo']}**: {alerta['producto']}\n\n"
-                                f"Categoría: {alerta['categoria']}\n\n"
-                                f"{alerta['mensaje']}"
+                                f"**{alerta.tipo}**: {alerta.producto}\n\n"
+                                f"Categoría: {alerta.categoria}\n\n"
+                                f"{alerta.mensaje}"
                             )
                 
-                if alertas['warning']:
+                if not alertas['warning'].empty:
                     with st.expander("⚠️ Advertencias", expanded=True):
-                        for alerta in alertas['warning']:
+                        for alerta in alertas['warning'].itertuples(index=False):
                             st.warning(
-                                f"**{alerta['tipo']}**: {alerta['producto']}\n\n"
-                                f"Categoría: {alerta['categoria']}\n\n"
-                                f"{alerta['mensaje']}"
+                                f"**{alerta.tipo}**: {alerta.producto}\n\n"
+                                f"Categoría: {alerta.categoria}\n\n"
+                                f"{alerta.mensaje}"
                             )
             
             with col2:
-                if alertas['opportunity']:
+                if not alertas['opportunity'].empty:
                     with st.expander("💡 Oportunidades", expanded=True):
-                        for alerta in alertas['opportunity']:
+                        for alerta in alertas['opportunity'].itertuples(index=False):
                             st.info(
-                                f"**{alerta['tipo']}**: {alerta['producto']}\n\n"
-                                f"Categoría: {alerta['categoria']}\n\n"
-                                f"{alerta['mensaje']}"
+                                f"**{alerta.tipo}**: {alerta.producto}\n\n"
+                                f"Categoría: {alerta.categoria}\n\n"
+                                f"{alerta.mensaje}"
                             )
 
         # Tablas de información
@@ -337,9 +335,6 @@ elif page == "Productos":
     st.title("Gestión de Productos")
     
     try:
-        # Inicializar visualizador
-        visualizer = DashboardVisualizer()
-        
         # Pestañas principales
         tab_catalogo, tab_analisis, tab_edicion = st.tabs([
             "📋 Catálogo", 
@@ -375,10 +370,11 @@ elif page == "Productos":
             with col1:
                 search_term = st.text_input("🔍 Buscar por nombre o SKU", "")
             with col2:
-                categorias = pd.read_sql("SELECT DISTINCT categoria FROM productos", db.engine)
+                with db.engine.connect() as conn:
+                    categorias = conn.execute(text("SELECT DISTINCT categoria FROM productos")).scalars().all()
                 categoria_filter = st.selectbox(
                     "📑 Filtrar por categoría", 
-                    ["Todas"] + categorias['categoria'].tolist()
+                    ["Todas"] + list(categorias)
                 )
             with col3:
                 stock_filter = st.selectbox(
@@ -641,9 +637,6 @@ elif page == "Ventas":
     st.title("Registro y Análisis de Ventas")
     
     try:
-        # Inicializar visualizador
-        visualizer = DashboardVisualizer()
-        
         # Crear pestañas
         tab_registro, tab_analisis, tab_tendencias = st.tabs([
             "🛍️ Registro de Ventas", 
@@ -961,9 +954,6 @@ elif page == "Predicciones":
     st.title("Predicciones de Ventas")
     
     try:
-        # Inicializar visualizador
-        visualizer = DashboardVisualizer()
-        
         # Crear pestañas
         tab_productos, tab_categorias = st.tabs([
             "🏷️ Predicción por Producto",
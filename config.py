@@ -14,4 +14,8 @@ DATABASE_CONFIG = {
 }
 
 # Construir DATABASE_URL para SQLAlchemy
-DATABASE_URL = f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
\ No newline at end of file
+DATABASE_URL = f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
+
+# Indica si la aplicación se conecta a través de PgBouncer (pool_mode=transaction, puerto 6432).
+# En ese caso PgBouncer gestiona el pool y SQLAlchemy no mantiene conexiones propias.
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes')
@@ -50,6 +50,7 @@ class AnomalyDetector:
             
             # Guardar anomalías detectadas en la base de datos
             anomalias_detectadas = sales_data[sales_data['anomaly'] == -1]
+            anomalias = []
             for _, row in anomalias_detectadas.iterrows():
                 anomaly_data = {
                     'tipo': 'venta',
@@ -58,10 +59,11 @@ class AnomalyDetector:
                     'score': float(row['anomaly_score']),
                     'descripcion': f"Anomalía detectada en ventas: {row['y']:.2f} unidades (esperado: {row['y_smooth']:.2f})"
                 }
-                try:
-                    self.db.save_anomaly(producto_id, anomaly_data)
-                except Exception as e:
-                    logger.error(f"Error al guardar anomalía: {e}")
+                anomalias.append((producto_id, anomaly_data))
+            try:
+                self.db.save_anomalies_bulk(anomalias, return_ids=False)
+            except Exception as e:
+                logger.error(f"Error al guardar anomalías: {e}")
             
             # Crear visualización
             fig = go.Figure()
@@ -69,8 +71,8 @@ class AnomalyDetector:
             # Ventas históricas
             fig.add_trace(
                 go.Scatter(
-                    x=sales_data['ds'],
-                    y=sales_data['y'],
+                    x=sales_data['ds'].to_numpy(),
+                    y=sales_data['y'].to_numpy(dtype=np.float64),
                     name="Ventas",
                     mode='lines',
                     line=dict(color='blue', width=1)
@@ -81,8 +83,8 @@ class AnomalyDetector:
             if len(anomalias_detectadas) > 0:
                 fig.add_trace(
                     go.Scatter(
-                        x=anomalias_detectadas['ds'],
-                        y=anomalias_detectadas['y'],
+                        x=anomalias_detectadas['ds'].to_numpy(),
+                        y=anomalias_detectadas['y'].to_numpy(dtype=np.float64),
                         mode='markers',
                         name='Anomalías',
                         marker=dict(color='red', size=10, symbol='x'),
@@ -139,6 +141,7 @@ class AnomalyDetector:
             
             # Guardar anomalías detectadas
             anomalias_detectadas = inventory_data[inventory_data['anomaly'] == -1]
+            anomalias = []
             for _, row in anomalias_detectadas.iterrows():
                 anomaly_data = {
                     'tipo': 'inventario',
@@ -147,10 +150,11 @@ class AnomalyDetector:
                     'score': float(row['anomaly_score']),
                     'descripcion': f"Cambio anormal en stock: {row['stock_change']:.0f} unidades"
                 }
-                try:
-                    self.db.save_anomaly(producto_id, anomaly_data)
-                except Exception as e:
-                    logger.error(f"Error al guardar anomalía de inventario: {e}")
+                anomalias.append((producto_id, anomaly_data))
+            try:
+                self.db.save_anomalies_bulk(anomalias, return_ids=False)
+            except Exception as e:
+                logger.error(f"Error al guardar anomalías de inventario: {e}")
             
             # Crear visualización
             fig = go.Figure()
@@ -158,8 +162,8 @@ class AnomalyDetector:
             # Stock normal
             fig.add_trace(
                 go.Scatter(
-                    x=inventory_data['fecha'],
-                    y=inventory_data['stock_actual'],
+                    x=inventory_data['fecha'].to_numpy(),
+                    y=inventory_data['stock_actual'].to_numpy(dtype=np.float64),
                     name="Stock",
                     mode='lines+markers',
                     line=dict(color='blue', width=1),
@@ -171,8 +175,8 @@ class AnomalyDetector:
             if len(anomalias_detectadas) > 0:
                 fig.add_trace(
                     go.Scatter(
-                        x=anomalias_detectadas['fecha'],
-                        y=anomalias_detectadas['stock_actual'],
+                        x=anomalias_detectadas['fecha'].to_numpy(),
+                        y=anomalias_detectadas['stock_actual'].to_numpy(dtype=np.float64),
                         mode='markers',
                         name='Anomalías',
                         marker=dict(color='red', size=10, symbol='x'),
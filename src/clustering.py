@@ -99,6 +99,7 @@ class ProductClusterer:
     def save_cluster_results(self, productos_df, clusters, cluster_analysis):
         """Guarda los resultados del clustering en la base de datos"""
         try:
+            resultados = []
             for idx, row in productos_df.iterrows():
                 cluster_id = clusters[idx]
                 cluster_info = cluster_analysis[f'cluster_{cluster_id}']
@@ -121,7 +122,9 @@ class ProductClusterer:
                                  f"y margen {'alto' if cluster_info['margen_promedio'] > productos_df['margen_porcentaje'].mean() else 'bajo'}"
                 }
                 
-                self.db.save_clustering(row['id'], cluster_data)
+                resultados.append((row['id'], cluster_data))
+            
+            self.db.save_clustering_bulk(resultados, return_ids=False)
                 
         except Exception as e:
             logger.error(f"Error en save_cluster_results: {e}")
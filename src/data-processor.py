@@ -2,29 +2,45 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+from sqlalchemy import text
+from src.utils import DateHelper
 
 logger = logging.getLogger(__name__)
 
+DAY_NS = 86_400_000_000_000
+
+# Frecuencias de ancho fijo: (ancho en ns, origen del primer bucket, desplazamiento de la etiqueta)
+# 'W' empieza en lunes (1970-01-05) y se etiqueta con el domingo, igual que pd.Grouper
+FIXED_BUCKETS = {
+    'D': (DAY_NS, 0, 0),
+    'W': (7 * DAY_NS, 4 * DAY_NS, 10 * DAY_NS),
+}
+
 class DataProcessor:
     """Clase para procesar y limpiar datos antes de visualización o análisis"""
     
     def __init__(self, database_manager):
         self.db = database_manager
 
-    def clean_sales_data(self, data):
-        """Limpia y prepara datos de ventas"""
+    def clean_sales_data(self, data, inplace=False):
+        """Limpia y prepara datos de ventas (con inplace=True modifica la entrada en lugar de copiarla)"""
         try:
-            df = data.copy()
+            df = data if inplace else data.copy()
             
             # Convertir fechas
-            df['fecha_venta'] = pd.to_datetime(df['fecha_venta'])
+            df['fecha_venta'] = DateHelper.to_datetime(df['fecha_venta'])
             
             # Eliminar valores negativos
             df['cantidad'] = df['cantidad'].clip(lower=0)
             df['precio_venta'] = df['precio_venta'].clip(lower=0)
             
-            # Calcular campos adicionales
-            df['total_venta'] = df['cantidad'] * df['precio_venta']
+            # total_venta es una columna generada en la base de datos
+            if 'total_venta' not in df.columns:
+                df['total_venta'] = df['cantidad'] * df['precio_venta']
+            
+            # Reducir cantidad a 32 bits cuando cabe; los importes siguen en float64 para no perder céntimos
+            if df['cantidad'].notna().all() and df['cantidad'].abs().max() <= np.iinfo(np.int32).max:
+                df['cantidad'] = df['cantidad'].astype('int32')
             
             # Ordenar por fecha
             df = df.sort_values('fecha_venta')
@@ -33,12 +49,15 @@ class DataProcessor:
             
         except Exception as e:
             logger.error(f"Error en clean_sales_data: {e}")
+            # Con inplace=True la entrada puede haber quedado a medio limpiar
+            if inplace:
+                raise
             return data
 
-    def clean_inventory_data(self, data):
-        """Limpia y prepara datos de inventario"""
+    def clean_inventory_data(self, data, inplace=False):
+        """Limpia y prepara datos de inventario (con inplace=True modifica la entrada en lugar de copiarla)"""
         try:
-            df = data.copy()
+            df = data if inplace else data.copy()
             
             # Eliminar valores negativos
             df['stock_actual'] = df['stock_actual'].clip(lower=0)
@@ -53,32 +72,26 @@ class DataProcessor:
             
         except Exception as e:
             logger.error(f"Error en clean_inventory_data: {e}")
+            # Con inplace=True la entrada puede haber quedado a medio limpiar
+            if inplace:
+                raise
             return data
 
     def prepare_prediction_data(self, historical_data, days=90):
         """Prepara datos para predicciones"""
         try:
-            df = historical_data.copy()
-            
-            # Asegurar formato de fecha
-            df['ds'] = pd.to_datetime(df['ds'])
+            # Días desde epoch como enteros para alinear sin hashear Timestamps
+            day_idx = DateHelper.to_datetime(historical_data['ds']).to_numpy().astype('datetime64[D]').astype('i8')
+            y = pd.to_numeric(historical_data['y'], errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype='f8')
             
-            # Rellenar fechas faltantes
-            date_range = pd.date_range(
-                start=df['ds'].min(),
-                end=df['ds'].max(),
-                freq='D'
-            )
-            df = df.set_index('ds').reindex(date_range).reset_index()
-            df = df.rename(columns={'index': 'ds'})
+            # Rellenar fechas faltantes con 0 sumando cada valor en su día
+            full_days = np.arange(day_idx.min(), day_idx.max() + 1)
+            y_full = np.bincount(day_idx - day_idx.min(), weights=y, minlength=full_days.size)
             
-            # Rellenar valores nulos
-            df['y'] = df['y'].fillna(0)
-            
-            # Eliminar valores negativos
-            df['y'] = df['y'].clip(lower=0)
-            
-            return df
+            return pd.DataFrame({
+                'ds': full_days.astype('datetime64[D]').astype('datetime64[ns]'),
+                'y': y_full
+            })
             
         except Exception as e:
             logger.error(f"Error en prepare_prediction_data: {e}")
@@ -87,17 +100,40 @@ class DataProcessor:
     def aggregate_sales_data(self, data, freq='D'):
         """Agrega datos de ventas por frecuencia especificada"""
         try:
-            df = data.copy()
-            
-            # Agrupar por fecha y categoría
-            aggregated = df.groupby([
-                pd.Grouper(key='fecha_venta', freq=freq),
-                'categoria'
-            ]).agg({
-                'cantidad': 'sum',
-                'total_venta': 'sum',
-                'beneficio': 'sum'
-            }).reset_index()
+            fechas = DateHelper.to_datetime(data['fecha_venta'])
+            
+            # Frecuencias sin ancho fijo (meses, horas, anclajes...): agrupación de pandas
+            if freq not in FIXED_BUCKETS:
+                return data.assign(fecha_venta=fechas).groupby([
+                    pd.Grouper(key='fecha_venta', freq=freq),
+                    'categoria'
+                ]).agg({
+                    'cantidad': 'sum',
+                    'total_venta': 'sum',
+                    'beneficio': 'sum'
+                }).reset_index()
+            
+            # Códigos enteros de periodo y categoría (se descartan claves nulas como en groupby)
+            width, origin, label_offset = FIXED_BUCKETS[freq]
+            bucket_codes, buckets = pd.factorize((fechas.to_numpy().view('i8') - origin) // width, sort=True)
+            bucket_codes[fechas.isna().to_numpy()] = -1
+            labels = pd.to_datetime(buckets * width + label_offset)
+            cat_codes, categorias = pd.factorize(data['categoria'], sort=True)
+            valid = (bucket_codes >= 0) & (cat_codes >= 0)
+            
+            # Clave compuesta periodo x categoría en un único int64
+            key = (bucket_codes[valid].astype('i8') << 20) | cat_codes[valid].astype('i8')
+            codes, uniques = pd.factorize(key, sort=True)
+            
+            aggregated = pd.DataFrame({
+                'fecha_venta': labels[uniques >> 20],
+                'categoria': categorias[uniques & 0xFFFFF]
+            })
+            for col in ['cantidad', 'total_venta', 'beneficio']:
+                values = data[col].to_numpy()[valid]
+                # Se acumula en float64 aunque la entrada venga en 32 bits
+                sums = np.bincount(codes, weights=values.astype('f8', copy=False), minlength=len(uniques))
+                aggregated[col] = sums.astype('int64') if values.dtype.kind in 'iu' else sums
             
             return aggregated
             
@@ -109,7 +145,7 @@ class DataProcessor:
         """Calcula métricas detalladas para un producto"""
         try:
             # Obtener datos del producto
-            query = """
+            query = text("""
                 WITH metricas AS (
                     SELECT 
                         p.id,
@@ -137,17 +173,11 @@ class DataProcessor:
                         ELSE 0
                     END as margen_porcentaje
                 FROM metricas
-            """
+            """)
             
             with self.db.engine.connect() as conn:
-                metrics = pd.read_sql(query, conn, params={'producto_id': producto_id})
-                
-                if not metrics.empty:
-                    metrics = metrics.iloc[0].to_dict()
-                else:
-                    metrics = {}
-                
-                return metrics
+                row = conn.execute(query, {'producto_id': producto_id}).mappings().first()
+                return dict(row) if row else {}
                 
         except Exception as e:
             logger.error(f"Error en calculate_product_metrics: {e}")
@@ -156,25 +186,17 @@ class DataProcessor:
     def get_trend_analysis(self, producto_id, days=30):
         """Analiza tendencias de ventas para un producto"""
         try:
-            query = """
-                WITH daily_sales AS (
-                    SELECT 
-                        DATE_TRUNC('day', fecha_venta) as fecha,
-                        SUM(cantidad) as ventas,
-                        AVG(precio_venta) as precio_promedio
-                    FROM ventas
-                    WHERE producto_id = :producto_id
-                    AND fecha_venta >= CURRENT_DATE - :days * INTERVAL '1 day'
-                    GROUP BY DATE_TRUNC('day', fecha_venta)
-                )
+            query = text("""
                 SELECT 
-                    fecha,
-                    ventas,
-                    precio_promedio,
-                    AVG(ventas) OVER (ORDER BY fecha ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) as media_movil_7d
-                FROM daily_sales
+                    DATE_TRUNC('day', fecha_venta) as fecha,
+                    SUM(cantidad) as ventas,
+                    AVG(precio_venta) as precio_promedio
+                FROM ventas
+                WHERE producto_id = :producto_id
+                AND fecha_venta >= CURRENT_DATE - :days * INTERVAL '1 day'
+                GROUP BY DATE_TRUNC('day', fecha_venta)
                 ORDER BY fecha
-            """
+            """)
             
             with self.db.engine.connect() as conn:
                 trend_data = pd.read_sql(
@@ -182,8 +204,15 @@ class DataProcessor:
                     conn, 
                     params={'producto_id': producto_id, 'days': days}
                 )
-                
-                return trend_data
+            
+            # Media móvil de 7 días con sumas acumuladas (media expansiva en los primeros días)
+            ventas = trend_data['ventas'].to_numpy(dtype='f8')
+            cs = np.concatenate(([0.0], np.cumsum(ventas)))
+            end = np.arange(1, len(ventas) + 1)
+            start = np.maximum(end - 7, 0)
+            trend_data['media_movil_7d'] = (cs[end] - cs[start]) / (end - start)
+            
+            return trend_data
                 
         except Exception as e:
             logger.error(f"Error en get_trend_analysis: {e}")
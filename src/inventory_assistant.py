@@ -1,23 +1,55 @@
 import pandas as pd
+import numpy as np
+import json
 import logging
-from typing import Dict, List, Optional
+import re
+import threading
+from typing import Dict, Iterator, List, Optional
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.memory import ConversationBufferMemory
 from langchain_ollama import OllamaLLM
 
 logger = logging.getLogger(__name__)
 
+# Filas de cada ranking que se incluyen en el prompt en lugar de la tabla completa
+PROMPT_TOP_N = 20
+
+# Modelo de Ollama y tiempo que debe permanecer cargado en memoria entre peticiones
+LLM_MODEL = "llama3.2"
+LLM_KEEP_ALIVE = "30m"
+
+# Palabras clave para determinar qué datos necesita cada pregunta, compiladas una sola vez
+# (búsqueda por subcadena sin distinguir mayúsculas, de modo que "vendido" cubre "vendidos")
+KEYWORD_PATTERNS = {
+    category: re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+    for category, words in {
+        "ventas": ["ventas", "vendido", "ingresos", "revenue"],
+        "inventario": ["stock", "inventario", "existencias"],
+        "productos": ["producto", "categoría", "SKU"],
+        "precios": ["precio", "margen", "beneficio"]
+    }.items()
+}
+
+def _to_json(data):
+    """Serializa el resumen convirtiendo tipos de numpy/pandas a valores JSON"""
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        default=lambda value: value.item() if hasattr(value, 'item') else str(value)
+    )
+
+def _empty_summary(data):
+    """Resumen explícito para tablas sin filas o sin columnas numéricas (no admiten rankings ni describe)"""
+    if data.empty or data.select_dtypes(include='number').empty:
+        return {"shape": data.shape, "columnas": list(data.columns)}
+    return None
+
 class InventoryAssistant:
     def __init__(self, db_manager):
         """Inicializa el asistente de inventario"""
         try:
-            self.llm = OllamaLLM(model="llama3.2")
+            # Un único cliente (conexión HTTP reutilizada) para todas las cadenas
+            self.llm = OllamaLLM(model=LLM_MODEL, keep_alive=LLM_KEEP_ALIVE)
             self.db = db_manager
-            self.memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True
-            )
             
             # Template para análisis general
             self.analysis_template = PromptTemplate(
@@ -69,37 +101,63 @@ class InventoryAssistant:
                 """
             )
             
-            self.analysis_chain = LLMChain(
-                llm=self.llm,
-                prompt=self.analysis_template,
-                memory=self.memory,
-                verbose=True
-            )
+            # Una cadena LCEL (prompt | llm) por tipo de petición, compuestas una sola vez
+            self.chains = {
+                "analysis": self.analysis_template | self.llm,
+                "query": self.query_template | self.llm,
+                "recommendations": self.recommendations_template | self.llm
+            }
             
-            self.query_chain = LLMChain(
-                llm=self.llm,
-                prompt=self.query_template,
-                memory=self.memory,
-                verbose=True
-            )
-            
-            self.recommendations_chain = LLMChain(
-                llm=self.llm,
-                prompt=self.recommendations_template,
-                memory=self.memory,
-                verbose=True
-            )
+            # Cargar el modelo en segundo plano para que la primera consulta no pague la carga
+            threading.Thread(target=self._warm_up, daemon=True).start()
             
         except Exception as e:
             logger.error(f"Error al inicializar el asistente: {e}")
             raise
 
+    def _warm_up(self):
+        """Carga el modelo en Ollama generando un único token"""
+        try:
+            # Mismo cliente que las cadenas; options sustituye a las del modelo solo en esta llamada
+            self.llm.invoke(".", options={"num_predict": 1})
+            logger.info(f"Modelo {LLM_MODEL} precargado")
+        except Exception as e:
+            logger.warning(f"No se pudo precargar el modelo {LLM_MODEL}: {e}")
+
+    def _summarize_inventory(self, inventory_data):
+        """Resume el inventario: rankings de ventas y stock más estadísticas por columna"""
+        empty = _empty_summary(inventory_data)
+        if empty is not None:
+            return empty
+        return {
+            "productos": len(inventory_data),
+            "mas_vendidos": inventory_data.nlargest(PROMPT_TOP_N, 'ventas_totales').to_dict('records'),
+            "stock_mas_bajo": inventory_data.nsmallest(PROMPT_TOP_N, 'stock_actual').to_dict('records'),
+            "estadisticas": inventory_data.describe(include='number').round(2).to_dict()
+        }
+
+    def _summarize_sales(self, sales_data):
+        """Resume las ventas agregadas por producto y categoría"""
+        empty = _empty_summary(sales_data)
+        if empty is not None:
+            return empty
+        por_producto = sales_data.groupby('producto')[['cantidad', 'total_venta']].sum()
+        por_categoria = sales_data.groupby('categoria')[['cantidad', 'total_venta']].sum()
+        return {
+            "ventas": len(sales_data),
+            "desde": sales_data['fecha_venta'].min(),
+            "hasta": sales_data['fecha_venta'].max(),
+            "productos_mas_vendidos": por_producto.nlargest(PROMPT_TOP_N, 'total_venta').round(2).reset_index().to_dict('records'),
+            "por_categoria": por_categoria.round(2).reset_index().to_dict('records'),
+            "estadisticas": sales_data.describe(include='number').round(2).to_dict()
+        }
+
     def _prepare_data_for_analysis(self, inventory_data, sales_data=None, metrics=None):
-        """Prepara los datos para el análisis en un formato de texto legible"""
-        data_str = f"Datos de Inventario:\n{inventory_data.to_string()}\n\n"
+        """Prepara un resumen de los datos para el análisis (no las tablas completas)"""
+        data_str = f"Datos de Inventario:\n{_to_json(self._summarize_inventory(inventory_data))}\n\n"
         
         if sales_data is not None:
-            data_str += f"Datos de Ventas:\n{sales_data.to_string()}\n\n"
+            data_str += f"Datos de Ventas:\n{_to_json(self._summarize_sales(sales_data))}\n\n"
         
         if metrics is not None:
             data_str += "Métricas Principales:\n"
@@ -108,8 +166,20 @@ class InventoryAssistant:
         
         return data_str
 
-    def get_inventory_insights(self) -> Dict:
-        """Genera insights automáticos sobre el inventario actual"""
+    def _run(self, kind: str, **inputs) -> str:
+        """Ejecuta la cadena indicada y devuelve la respuesta completa"""
+        return self.chains[kind].invoke(inputs)
+
+    def _stream(self, kind: str, **inputs) -> Iterator[str]:
+        """Emite la respuesta del modelo por fragmentos; los errores se propagan"""
+        try:
+            yield from self.chains[kind].stream(inputs)
+        except Exception as e:
+            logger.error(f"Error al generar respuesta en streaming: {e}")
+            raise
+
+    def get_inventory_insights(self, stream: bool = False) -> Dict:
+        """Genera insights automáticos sobre el inventario actual (con stream=True, 'analysis' es un generador)"""
         try:
             # Obtener datos actualizados
             inventory_data = self.db.get_inventory_report()
@@ -118,13 +188,16 @@ class InventoryAssistant:
             if inventory_data.empty or sales_data.empty:
                 return {"error": "No hay suficientes datos para generar insights"}
             
-            # Preparar métricas clave
+            # Preparar métricas clave (conteos sobre arrays, sin copiar el DataFrame filtrado)
             metrics = {
                 "total_productos": len(inventory_data),
                 "valor_total_inventario": inventory_data['valor_inventario'].sum(),
-                "productos_sin_stock": len(inventory_data[inventory_data['stock_actual'] == 0]),
+                "productos_sin_stock": int((inventory_data['stock_actual'].to_numpy() == 0).sum()),
                 "ventas_totales": sales_data['cantidad'].sum(),
-                "ingresos_totales": (sales_data['cantidad'] * sales_data['precio_venta']).sum()
+                "ingresos_totales": float(np.dot(
+                    sales_data['cantidad'].to_numpy(dtype=np.float64),
+                    sales_data['precio_venta'].to_numpy(dtype=np.float64)
+                ))
             }
             
             # Preparar datos para el modelo
@@ -135,7 +208,10 @@ class InventoryAssistant:
             )
             
             # Generar análisis
-            response = self.analysis_chain.run(data=prepared_data)
+            if stream:
+                response = self._stream("analysis", data=prepared_data)
+            else:
+                response = self._run("analysis", data=prepared_data)
             
             return {
                 "analysis": response,
@@ -147,29 +223,35 @@ class InventoryAssistant:
             logger.error(f"Error al generar insights: {e}")
             return {"error": str(e)}
 
-    def answer_query(self, question: str) -> str:
-        try:
-            # Obtener datos relevantes
-            relevant_data = self._get_relevant_data(question)
-            
-            # Combinar la pregunta y los datos en un solo string
-            combined_input = f"""
+    def _build_query_input(self, question: str) -> str:
+        """Combina la pregunta y los datos relevantes en un solo string"""
+        relevant_data = self._get_relevant_data(question)
+        return f"""
             Datos relevantes:
             {relevant_data}
             
             Pregunta del usuario:
             {question}
             """
-            
+
+    def answer_query(self, question: str) -> str:
+        try:
             # Ejecutar la cadena con el input combinado
-            response = self.query_chain.run(input=combined_input)
-            
-            return response
+            return self._run("query", input=self._build_query_input(question))
             
         except Exception as e:
             logger.error(f"Error al responder consulta: {e}")
             return f"Error al responder consulta: {e}"
 
+    def stream_query(self, question: str) -> Iterator[str]:
+        """Responde una consulta emitiendo la respuesta por fragmentos (lanza excepción si falla)"""
+        try:
+            combined_input = self._build_query_input(question)
+        except Exception as e:
+            logger.error(f"Error al responder consulta: {e}")
+            raise
+        return self._stream("query", input=combined_input)
+
         
     def get_recommendations(self) -> Dict:
         """Genera recomendaciones específicas de acciones a tomar"""
@@ -184,14 +266,18 @@ class InventoryAssistant:
                 sales_data
             )
             
-            response = self.recommendations_chain.run(data=prepared_data)
+            response = self._run("recommendations", data=prepared_data)
+            
+            # Conteos sobre arrays, sin copiar el DataFrame filtrado
+            stock = inventory_data['stock_actual'].to_numpy()
+            ventas = inventory_data['ventas_totales'].to_numpy()
             
             return {
                 "recommendations": response,
                 "data_summary": {
-                    "productos_stock_bajo": len(inventory_data[inventory_data['stock_actual'] <= 5]),
-                    "productos_sin_ventas": len(inventory_data[inventory_data['ventas_totales'] == 0]),
-                    "productos_alta_rotacion": len(inventory_data[inventory_data['ventas_totales'] > 100])
+                    "productos_stock_bajo": int((stock <= 5).sum()),
+                    "productos_sin_ventas": int((ventas == 0).sum()),
+                    "productos_alta_rotacion": int((ventas > 100).sum())
                 },
                 "timestamp": pd.Timestamp.now()
             }
@@ -203,37 +289,27 @@ class InventoryAssistant:
     def _get_relevant_data(self, question: str) -> str:
         """Determina y obtiene los datos relevantes para una pregunta específica"""
         try:
-            # Palabras clave para determinar qué datos necesitamos
-            keywords = {
-                "ventas": ["ventas", "vendido", "ingresos", "revenue"],
-                "inventario": ["stock", "inventario", "existencias"],
-                "productos": ["producto", "categoría", "SKU"],
-                "precios": ["precio", "margen", "beneficio"]
-            }
-            
-            needed_data = []
-            question_lower = question.lower()
-            
             # Identificar qué datos necesitamos
-            for category, words in keywords.items():
-                if any(word in question_lower for word in words):
-                    needed_data.append(category)
+            needed_data = [
+                category for category, pattern in KEYWORD_PATTERNS.items()
+                if pattern.search(question)
+            ]
             
             # Si no identificamos nada específico, traer datos básicos
             if not needed_data:
                 needed_data = ["ventas", "inventario"]
             
-            # Obtener los datos relevantes
+            # Obtener y resumir los datos relevantes
             relevant_data = {}
             
             if "ventas" in needed_data:
-                relevant_data["ventas"] = self.db.get_sales_report()
+                relevant_data["ventas"] = self._summarize_sales(self.db.get_sales_report())
             if "inventario" in needed_data:
-                relevant_data["inventario"] = self.db.get_inventory_report()
+                relevant_data["inventario"] = self._summarize_inventory(self.db.get_inventory_report())
             
             # Convertir los datos a string de forma ordenada
             return "\n\n".join([
-                f"{key.upper()}:\n{value.to_string()}"
+                f"{key.upper()}:\n{_to_json(value)}"
                 for key, value in relevant_data.items()
             ])
             
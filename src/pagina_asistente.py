@@ -15,7 +15,7 @@ def pagina_asistente(db, assistant):
         
         if st.button("Generar Insights", key="generate_insights"):
             with st.spinner("Analizando datos..."):
-                insights = assistant.get_inventory_insights()
+                insights = assistant.get_inventory_insights(stream=True)
                 
                 if "error" in insights:
                     st.error(f"Error al generar insights: {insights['error']}")
@@ -38,17 +38,12 @@ def pagina_asistente(db, assistant):
                             f"{insights['metrics']['productos_sin_stock']:,}"
                         )
                     
-                    # Mostrar análisis detallado
+                    # Mostrar análisis detallado según se genera
                     st.markdown("### Análisis Detallado")
-                    
-                    # Dividir el análisis en secciones
-                    analysis_text = insights['analysis']
-                    sections = analysis_text.split('\n\n')
-                    
-                    for section in sections:
-                        if section.strip():
-                            st.markdown(section)
-                            st.markdown("---")
+                    try:
+                        st.write_stream(insights['analysis'])
+                    except Exception as e:
+                        st.error(f"Error al generar insights: {e}")
                     
                     # Timestamp del análisis
                     st.caption(f"Análisis generado el {insights['timestamp']}")
@@ -73,16 +68,13 @@ def pagina_asistente(db, assistant):
         
         if question:
             if st.button("Obtener Respuesta", key="get_answer"):
-                with st.spinner("Analizando tu pregunta..."):
-                    response = assistant.answer_query(question)
-                    if isinstance(response, str):
-                        if response.startswith("Error"):
-                            st.error(response)
-                        else:
-                            st.markdown("### Respuesta")
-                            st.write(response)
-                    else:
-                        st.error("Respuesta inesperada del asistente")
+                try:
+                    with st.spinner("Analizando tu pregunta..."):
+                        response = assistant.stream_query(question)
+                    st.markdown("### Respuesta")
+                    st.write_stream(response)
+                except Exception as e:
+                    st.error(f"Error al responder consulta: {e}")
 
     
     with tab3:
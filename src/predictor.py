@@ -1,21 +1,42 @@
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import numpy as np
 import logging
 from datetime import timedelta
-from langchain_ollama import OllamaLLM
+from functools import lru_cache
+from src.utils import DateHelper
 
 logger = logging.getLogger(__name__)
 
+# Columnas de la predicción y del histórico que intervienen en calculate_metrics
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+HISTORICAL_COLUMNS = ['ds', 'y']
+
+# Nombres de los días de la semana indexados por dayofweek (0 = lunes)
+WEEKDAYS = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+DIAS_ES = np.array(['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo'])
+
+def _frame_key(df, columns):
+    """Clave hashable con el contenido exacto de las columnas (nombre, dtype y bytes)"""
+    key = []
+    for col in columns:
+        values = DateHelper.to_datetime(df[col]) if col == 'ds' else pd.to_numeric(df[col])
+        values = values.to_numpy()
+        if values.dtype.kind not in 'fiuM':
+            raise TypeError(f"Columna {col} no numérica: {values.dtype}")
+        key.append((col, values.dtype.str, values.tobytes()))
+    return tuple(key)
+
+def _frame_from_key(key):
+    """Reconstruye el DataFrame a partir de una clave de _frame_key"""
+    return pd.DataFrame({col: np.frombuffer(buffer, dtype=dtype) for col, dtype, buffer in key})
+
 class SalesPredictor:
     def __init__(self):
-        """Inicializa el predictor de ventas usando Llama 3.2"""
-        try:
-            self.llm = OllamaLLM(model="llama3.2")
-            logger.info("SalesPredictor inicializado con Llama 3.2")
-        except Exception as e:
-            logger.error(f"Error al inicializar SalesPredictor: {e}")
-            raise
+        """Inicializa el predictor de ventas"""
+        # Métricas por contenido de predicción e histórico: los re-renderizados no las recalculan
+        self._metrics_cache = lru_cache(maxsize=128)(self._metrics_from_key)
+        logger.info("SalesPredictor inicializado")
 
     def predict_sales(self, historical_data: pd.DataFrame, periods: int = 30) -> Optional[pd.DataFrame]:
         """
@@ -30,44 +51,41 @@ class SalesPredictor:
             historical_data['y'] = pd.to_numeric(historical_data['y'], errors='coerce')
             historical_data = historical_data.dropna(subset=['y'])
 
-            # Calcular estadísticas básicas
-            mean_sales = historical_data['y'].mean() or 0
-            std_sales = historical_data['y'].std() or 0
-            trend = self._calculate_trend(historical_data) or 0
-            seasonality = self._calculate_seasonality(historical_data)
-
             # Generar fechas futuras
-            last_date = pd.to_datetime(historical_data['ds'].max())
+            last_date = DateHelper.to_datetime(historical_data['ds']).max()
             future_dates = pd.date_range(
                 start=last_date + timedelta(days=1),
                 periods=periods,
                 freq='D'
             )
 
-            # Generar predicciones base
-            predictions = []
-            lower_bounds = []
-            upper_bounds = []
-
-            for i, date in enumerate(future_dates):
-                # Predicción base usando la media y tendencia
-                base_prediction = max(0, mean_sales * (1 + trend * (i/30)))
-                
-                # Ajustar por estacionalidad
-                weekday = date.weekday()
-                seasonal_factor = seasonality.get(weekday, 1.0)
-                
-                # Añadir variación controlada
-                prediction = max(0, base_prediction * seasonal_factor)
-                
-                # Calcular intervalos de confianza
-                std_factor = 1.96  # 95% intervalo de confianza
-                lower = max(0, prediction - std_factor * std_sales)
-                upper = prediction + std_factor * std_sales
-
-                predictions.append(prediction)
-                lower_bounds.append(lower)
-                upper_bounds.append(upper)
+            # Sin ventas la predicción es nula: evitar el cálculo de tendencia y estacionalidad
+            if not np.count_nonzero(historical_data['y'].to_numpy()):
+                zeros = np.zeros(periods)
+                return pd.DataFrame({
+                    'ds': future_dates,
+                    'yhat': zeros,
+                    'yhat_lower': zeros,
+                    'yhat_upper': zeros
+                })
+
+            # Calcular estadísticas básicas (media, desviación y tendencia sobre la misma suma)
+            mean_sales, std_sales, trend = self._calculate_stats(historical_data['y'])
+            seasonality = self._calculate_seasonality(historical_data)
+
+            # Generar predicciones para todo el horizonte de una vez
+            # Predicción base usando la media y tendencia
+            steps = np.arange(periods)
+            base_prediction = np.maximum(0, mean_sales * (1 + trend * (steps / 30)))
+            
+            # Ajustar por estacionalidad según el día de la semana de cada fecha
+            seasonal_factors = np.array([seasonality.get(day, 1.0) for day in range(7)])
+            predictions = np.maximum(0, base_prediction * seasonal_factors[future_dates.weekday.to_numpy()])
+            
+            # Calcular intervalos de confianza
+            std_factor = 1.96  # 95% intervalo de confianza
+            lower_bounds = np.maximum(0, predictions - std_factor * std_sales)
+            upper_bounds = predictions + std_factor * std_sales
 
             # Crear DataFrame de predicciones
             forecast = pd.DataFrame({
@@ -83,44 +101,71 @@ class SalesPredictor:
             logger.error(f"Error en predict_sales: {e}")
             return None
 
-    def _calculate_trend(self, data: pd.DataFrame) -> float:
-        """Calcula la tendencia en los datos históricos"""
+    def _calculate_stats(self, y: pd.Series) -> Tuple[float, float, float]:
+        """Calcula media, desviación típica (muestral) y tendencia de los datos históricos"""
         try:
-            if len(data) < 2:
-                return 0.0
-                
-            # Calcular tendencia como cambio porcentual promedio
-            sales = data['y'].values
-            diffs = np.diff(sales)
-            avg_diff = np.mean(diffs)
-            return avg_diff / (np.mean(sales[:-1]) + 1e-6)  # Evitar división por cero
+            sales = np.ascontiguousarray(y.to_numpy(dtype=np.float64))
+            n = sales.size
+            total = sales.sum()
+            mean_sales = total / n
+            if n < 2:
+                return mean_sales, 0.0, 0.0
+            
+            centered = sales - mean_sales
+            std_sales = np.sqrt(np.dot(centered, centered) / (n - 1))
+            
+            # Tendencia como cambio porcentual promedio: la media de las diferencias consecutivas
+            # es (último - primero) / (n - 1) y la media de sales[:-1] sale de la suma total
+            avg_diff = (sales[-1] - sales[0]) / (n - 1)
+            trend = avg_diff / ((total - sales[-1]) / (n - 1) + 1e-6)  # Evitar división por cero
+            return mean_sales, std_sales, trend
         except Exception as e:
-            logger.error(f"Error al calcular tendencia: {e}")
-            return 0.0
+            logger.error(f"Error al calcular estadísticas: {e}")
+            return 0.0, 0.0, 0.0
 
     def _calculate_seasonality(self, data: pd.DataFrame) -> Dict[int, float]:
         """Calcula factores de estacionalidad por día de la semana"""
         try:
-            # Convertir fechas a día de la semana
-            data['weekday'] = pd.to_datetime(data['ds']).dt.weekday
+            # Sumas y conteos por día de la semana con bincount en lugar de groupby
+            weekdays = DateHelper.to_datetime(data['ds']).dt.weekday.to_numpy()
+            sales = data['y'].to_numpy(dtype=np.float64)
+            sums = np.bincount(weekdays, weights=sales, minlength=7)
+            counts = np.bincount(weekdays, minlength=7)
+            overall_avg = sales.mean() or 1.0  # Evitar división por cero
             
-            # Calcular factor estacional por día
-            daily_avg = data.groupby('weekday')['y'].mean()
-            overall_avg = data['y'].mean() or 1.0  # Evitar división por cero
+            # Días sin datos: factor neutro
+            factors = np.ones(7)
+            observed = counts > 0
+            factors[observed] = np.clip(sums[observed] / counts[observed] / overall_avg, 0.5, 1.5)
             
-            seasonality = {}
-            for day in range(7):
-                if day in daily_avg.index:
-                    seasonality[day] = max(0.5, min(1.5, daily_avg[day] / overall_avg))
-                else:
-                    seasonality[day] = 1.0
-                    
-            return seasonality
+            return {day: float(factor) for day, factor in enumerate(factors)}
         except Exception as e:
             logger.error(f"Error al calcular estacionalidad: {e}")
             return {i: 1.0 for i in range(7)}
 
     def calculate_metrics(self, forecast: pd.DataFrame, historical_data: pd.DataFrame) -> Dict:
+        """Calcula métricas y recomendaciones basadas en las predicciones (cacheadas por contenido)"""
+        try:
+            forecast_key = _frame_key(forecast, FORECAST_COLUMNS)
+            historical_key = _frame_key(historical_data, HISTORICAL_COLUMNS)
+        except Exception:
+            # Datos ausentes o no convertibles: cálculo directo con su propio manejo de errores
+            return self._compute_metrics(forecast, historical_data)
+        
+        metrics = self._metrics_cache(forecast_key, historical_key)
+        # Copias para que el llamador no altere el resultado cacheado
+        return {
+            'trend_change': metrics['trend_change'],
+            'monthly_predictions': metrics['monthly_predictions'].copy(),
+            'stock_recommendations': dict(metrics['stock_recommendations']),
+            'weekly_pattern': metrics['weekly_pattern'].copy()
+        }
+
+    def _metrics_from_key(self, forecast_key, historical_key) -> Dict:
+        """Calcula las métricas a partir de las claves de contenido"""
+        return self._compute_metrics(_frame_from_key(forecast_key), _frame_from_key(historical_key))
+
+    def _compute_metrics(self, forecast: pd.DataFrame, historical_data: pd.DataFrame) -> Dict:
         """Calcula métricas y recomendaciones basadas en las predicciones"""
         try:
             if forecast is None or historical_data is None:
@@ -148,25 +193,24 @@ class SalesPredictor:
             try:
                 if not historical_data.empty:
                     # Convertir la columna ds a datetime si no lo es ya
-                    historical_data['ds'] = pd.to_datetime(historical_data['ds'])
-                    # Crear el día de la semana como string para mejor visualización
-                    historical_data['weekday'] = historical_data['ds'].dt.strftime('%A')
-                    # Calcular la media de ventas por día
-                    weekly_pattern = historical_data.groupby('weekday')['y'].agg([
-                        ('ventas_promedio', 'mean'),
-                        ('conteo', 'count')
-                    ]).reset_index()
-                    # Ordenar los días de la semana correctamente
-                    dias_orden = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                    weekly_pattern['weekday'] = pd.Categorical(weekly_pattern['weekday'], categories=dias_orden, ordered=True)
-                    weekly_pattern = weekly_pattern.sort_values('weekday')
-                    # Traducir los nombres de los días
-                    dias_es = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-                    weekly_pattern['dia'] = dias_es
+                    historical_data['ds'] = DateHelper.to_datetime(historical_data['ds'])
+                    # Sumas y conteos por día de la semana en una sola pasada (ignorando valores nulos)
+                    weekday = historical_data['ds'].dt.dayofweek.to_numpy()
+                    ventas = historical_data['y'].to_numpy(dtype=np.float64)
+                    valid = ~np.isnan(ventas)
+                    sums = np.bincount(weekday[valid], weights=ventas[valid], minlength=7)
+                    counts = np.bincount(weekday[valid], minlength=7)
+                    # Días sin ventas registradas: media 0
+                    weekly_pattern = pd.DataFrame({
+                        'weekday': WEEKDAYS,
+                        'ventas_promedio': sums / np.maximum(counts, 1),
+                        'conteo': counts,
+                        'dia': DIAS_ES
+                    })
             except Exception as e:
                 logger.error(f"Error al calcular patrón semanal: {e}")
                 weekly_pattern = pd.DataFrame({
-                    'dia': dias_es,
+                    'dia': DIAS_ES,
                     'ventas_promedio': [0] * 7,
                     'conteo': [0] * 7
                 })
@@ -183,7 +227,7 @@ class SalesPredictor:
             }
 
         except Exception as e:
-            logger.error(f"Error en calculate_metrics: {e}")
+            logger.error(f"Error en _compute_metrics: {e}")
             return {
                 'trend_change': 0.0,
                 'monthly_predictions': pd.DataFrame(),
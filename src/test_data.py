@@ -9,6 +9,9 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Generador PCG64 compartido en lugar del estado global de np.random
+_RNG = np.random.default_rng()
+
 def insert_test_products(db):
     """Inserta productos de prueba en la base de datos"""
     productos = [
@@ -104,28 +107,23 @@ def insert_test_products(db):
         }
     ]
     
-    for producto in productos:
-        try:
-            db.add_product(
-                producto["sku"],
-                producto["nombre"],
-                producto["precio_compra"],
-                producto["precio_venta"],
-                producto["stock_actual"],
-                producto["stock_minimo"],
-                producto["categoria"]
-            )
-            logger.info(f"Producto añadido: {producto['nombre']}")
-        except Exception as e:
-            logger.error(f"Error al añadir {producto['nombre']}: {str(e)}")
+    try:
+        db.bulk_add_products(productos)
+        logger.info(f"Productos añadidos: {len(productos)}")
+    except Exception as e:
+        logger.error(f"Error al añadir productos: {str(e)}")
 
 def insert_test_sales(db):
     """Genera e inserta ventas de prueba"""
     try:
-        # Obtener IDs de productos
-        productos = pd.read_sql("SELECT id, precio_venta FROM productos", db.engine)
+        # Obtener IDs de productos directamente como arrays (sin DataFrame intermedio)
+        with db.engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, precio_venta, stock_actual FROM productos")).all()
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        precios_base = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        stock = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
         
-        if productos.empty:
+        if not rows:
             logger.error("No hay productos disponibles para generar ventas")
             return
         
@@ -134,33 +132,41 @@ def insert_test_sales(db):
         start_date = end_date - timedelta(days=30)
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         
-        ventas_generadas = 0
+        # Todas las ventas se generan con sorteos vectorizados de una vez
+        n_per_day = _RNG.integers(2, 6, size=len(dates))  # 2-5 ventas por día
+        total = int(n_per_day.sum())
+        product_idx = _RNG.integers(len(ids), size=total)  # Producto aleatorio
+        cantidades = _RNG.integers(1, 5, size=total)  # 1-5 unidades
+        # Variación aleatoria en el precio (±10%)
+        precios = np.round(
+            precios_base[product_idx] * _RNG.uniform(0.9, 1.1, size=total),
+            2
+        )
+        fechas = np.repeat(dates.to_pydatetime(), n_per_day)
+        
+        # Descartar las ventas que superen el stock disponible de cada producto
+        acumulado = pd.Series(cantidades).groupby(product_idx).cumsum().to_numpy()
+        validas = acumulado <= stock[product_idx]
+        if not validas.all():
+            logger.warning(f"Ventas descartadas por stock insuficiente: {int((~validas).sum())}")
+        
+        ventas = [
+            {
+                'producto_id': int(producto_id),
+                'cantidad': int(cantidad),
+                'precio_venta': float(precio_venta),
+                'fecha_venta': fecha_venta
+            }
+            for producto_id, cantidad, precio_venta, fecha_venta in zip(
+                ids[product_idx][validas],
+                cantidades[validas],
+                precios[validas],
+                fechas[validas]
+            )
+        ]
         
-        for date in dates:
-            # Generar 2-5 ventas por día
-            n_sales = np.random.randint(2, 6)
-            for _ in range(n_sales):
-                # Seleccionar producto aleatorio
-                producto = productos.sample(1).iloc[0]
-                
-                # Generar cantidad aleatoria (1-5 unidades)
-                cantidad = np.random.randint(1, 5)
-                
-                # Variación aleatoria en el precio (±10%)
-                precio_base = float(producto['precio_venta'])
-                precio_venta = round(precio_base * np.random.uniform(0.9, 1.1), 2)
-                
-                try:
-                    db.register_sale(
-                        producto_id=producto['id'],
-                        cantidad=cantidad,
-                        precio_venta=precio_venta
-                    )
-                    ventas_generadas += 1
-                    if ventas_generadas % 10 == 0:  # Log cada 10 ventas
-                        logger.info(f"Generadas {ventas_generadas} ventas...")
-                except Exception as e:
-                    logger.error(f"Error al registrar venta para producto {producto['id']}: {str(e)}")
+        # Insertar todas las ventas en una sola transacción
+        ventas_generadas = db.bulk_register_sales(ventas) if ventas else 0
         
         logger.info(f"Proceso completado. Total de ventas generadas: {ventas_generadas}")
         
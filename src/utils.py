@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import copy
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 
 # Configuración de logging
@@ -16,6 +18,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CONFIG_PATH = Path("config.json")
+
+@lru_cache(maxsize=1)
+def _read_config_file(path, mtime_ns, size):
+    """Lee y parsea el archivo de configuración (mtime y tamaño solo invalidan la caché)"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
 class Config:
     """Clase para manejar la configuración de la aplicación"""
     
@@ -47,12 +57,13 @@ class Config:
         self.config = self.load_config()
 
     def load_config(self):
-        """Carga la configuración desde archivo"""
+        """Carga la configuración desde archivo (parseado una vez por versión del archivo)"""
         try:
-            config_path = Path("config.json")
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    return {**self.DEFAULT_CONFIG, **json.load(f)}
+            if CONFIG_PATH.exists():
+                stat = CONFIG_PATH.stat()
+                loaded = _read_config_file(CONFIG_PATH, stat.st_mtime_ns, stat.st_size)
+                # Copia para que las modificaciones de esta instancia no alteren la caché
+                return {**self.DEFAULT_CONFIG, **copy.deepcopy(loaded)}
             return self.DEFAULT_CONFIG
         except Exception as e:
             logger.error(f"Error loading config: {e}")
@@ -61,7 +72,7 @@ class Config:
     def save_config(self):
         """Guarda la configuración actual"""
         try:
-            with open("config.json", 'w') as f:
+            with open(CONFIG_PATH, 'w') as f:
                 json.dump(self.config, f, indent=4)
         except Exception as e:
             logger.error(f"Error saving config: {e}")
@@ -71,8 +82,19 @@ class MetricsCalculator:
     
     @staticmethod
     def calculate_moving_average(data, window=7):
-        """Calcula la media móvil de una serie"""
-        return data.rolling(window=window, min_periods=1).mean()
+        """Calcula la media móvil de una serie en O(n) con sumas acumuladas (ignora NaN como rolling)"""
+        values = np.asarray(data, dtype=np.float64)
+        valid = ~np.isnan(values)
+        sums = np.cumsum(np.where(valid, values, 0.0))
+        counts = np.cumsum(valid)
+        # Restar la suma acumulada de `window` posiciones antes
+        sums[window:] -= sums[:-window].copy()
+        counts[window:] -= counts[:-window].copy()
+        average = np.full(values.shape, np.nan)
+        np.divide(sums, counts, out=average, where=counts > 0)
+        if isinstance(data, pd.Series):
+            return pd.Series(average, index=data.index, name=data.name)
+        return average
 
     @staticmethod
     def calculate_growth_rate(data):
@@ -81,13 +103,22 @@ class MetricsCalculator:
 
     @staticmethod
     def calculate_stock_turnover(sales, stock):
-        """Calcula la rotación de inventario"""
-        return np.where(stock > 0, sales / stock, 0)
+        """Calcula la rotación de inventario (solo divide donde hay stock)"""
+        sales = np.asarray(sales, dtype=np.float64)
+        stock = np.asarray(stock, dtype=np.float64)
+        turnover = np.zeros(np.broadcast(sales, stock).shape)
+        np.divide(sales, stock, out=turnover, where=stock > 0)
+        return turnover
 
     @staticmethod
     def calculate_margin(revenue, cost):
-        """Calcula el margen de beneficio"""
-        return np.where(revenue > 0, (revenue - cost) / revenue * 100, 0)
+        """Calcula el margen de beneficio (solo divide donde hay ingresos)"""
+        revenue = np.asarray(revenue, dtype=np.float64)
+        cost = np.asarray(cost, dtype=np.float64)
+        margin = np.zeros(np.broadcast(revenue, cost).shape)
+        np.divide(revenue - cost, revenue, out=margin, where=revenue > 0)
+        margin *= 100
+        return margin
 
 class DataValidator:
     """Clase para validación de datos"""
@@ -150,6 +181,13 @@ class DateHelper:
             
         return start_date, end_date
 
+    @staticmethod
+    def to_datetime(values):
+        """Convierte a datetime64 solo si hace falta, con formato ISO fijo para evitar la inferencia"""
+        if values.dtype.kind == 'M':
+            return values
+        return pd.to_datetime(values, format='ISO8601', cache=True)
+
     @staticmethod
     def generate_date_series(start_date, end_date, freq='D'):
         """Genera serie de fechas"""
@@ -1,39 +1,172 @@
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 import logging
+from src.utils import DateHelper
 
 logger = logging.getLogger(__name__)
 
+def _compact_dates(values):
+    """Fechas con resolución de segundos: cadenas más cortas al serializar la figura"""
+    return DateHelper.to_datetime(values).to_numpy().astype('datetime64[s]')
+
+# Puntos máximos por traza de serie temporal: más de los que caben en el ancho del gráfico
+MAX_TRACE_POINTS = 2000
+
+# Figuras que se conservan en caché (entre todos los gráficos), descartando la menos usada
+FIG_CACHE_SIZE = 8
+
+def _lttb_indices(x, y, n_out):
+    """Índices de los puntos elegidos por Largest-Triangle-Three-Buckets sobre x ordenado"""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    x = x.astype(np.float64) - x[0]
+    y = y.astype(np.float64)
+    # n_out - 2 buckets entre el primer y el último punto, que se conservan siempre
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Vértice C: media del bucket siguiente (o el último punto)
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Punto del bucket que forma el triángulo de mayor área con A y C
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    
+    return indices
+
+def _downsample(x, y, n_out=MAX_TRACE_POINTS):
+    """Reduce una serie (x fechas o números) a n_out puntos con LTTB, ordenada por x"""
+    x_values = x.view(np.int64) if x.dtype.kind == 'M' else x
+    order = np.argsort(x_values, kind='stable')
+    keep = order[_lttb_indices(x_values[order], y[order], n_out)]
+    return x[keep], y[keep]
+
+def _content_key(*frames):
+    """Huella del contenido de los DataFrames (None se conserva tal cual)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        if frame is None:
+            digest.update(b'none')
+            continue
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.digest()
+
+def _copy_figures(value):
+    """Copia una figura, o cada figura de un dict de figuras"""
+    if isinstance(value, dict):
+        return {name: _copy_figures(figure) for name, figure in value.items()}
+    if isinstance(value, go.Figure):
+        return go.Figure(value)
+    return value
+
 class DashboardVisualizer:
     def __init__(self, theme="plotly_white"):
         self.theme = theme
+        # Figuras por (gráfico, tema, huella de los datos): datos ya vistos reutilizan su figura
+        self._fig_cache = OrderedDict()
+        # La instancia se comparte entre sesiones (st.cache_resource): el LRU se modifica bajo lock
+        self._fig_cache_lock = threading.Lock()
+        # Rejillas 2x2 de los dashboards construidas una vez: cada render parte de una copia
+        self._main_skeleton = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=(
+                "Tendencia de Ventas y Predicción",
+                "Ventas por Categoría",
+                "Stock Actual por Categoría",
+                "Rentabilidad por Categoría"
+            ),
+            vertical_spacing=0.12,
+            horizontal_spacing=0.1
+        )
+        self._perf_skeleton = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=(
+                "Ventas vs Tiempo",
+                "Distribución del Beneficio",
+                "Rendimiento por Categoría",
+                "Tendencia de Márgenes"
+            ),
+            vertical_spacing=0.12,
+            horizontal_spacing=0.1
+        )
+
+    def _cached_figure(self, name, build, *frames):
+        """Devuelve la figura en caché si ya se construyó con los mismos datos y tema; si no, la construye"""
+        try:
+            key = (name, self.theme, _content_key(*frames))
+        except Exception as e:
+            logger.warning(f"No se pudo calcular la huella de {name}: {e}")
+            return build(*frames)
+        
+        with self._fig_cache_lock:
+            figure = self._fig_cache.get(key)
+            if figure is not None:
+                self._fig_cache.move_to_end(key)
+        
+        if figure is None:
+            # La construcción queda fuera del lock para no serializar los renders de otras sesiones
+            figure = build(*frames)
+            with self._fig_cache_lock:
+                self._fig_cache[key] = figure
+                self._fig_cache.move_to_end(key)
+                while len(self._fig_cache) > FIG_CACHE_SIZE:
+                    self._fig_cache.popitem(last=False)
+        
+        # Cada llamada recibe copias: quien modifique la figura (update_layout, etc.) no altera la caché
+        return _copy_figures(figure)
 
     def create_main_dashboard(self, sales_data, inventory_data, predictions_data):
+        """Crea el dashboard principal (reutiliza la figura si los datos no han cambiado)"""
+        return self._cached_figure('main', self._build_main_dashboard, sales_data, inventory_data, predictions_data)
+
+    def create_sales_analysis(self, sales_data):
+        """Crea visualizaciones para el análisis de ventas (reutilizadas si los datos no han cambiado)"""
+        return self._cached_figure('sales', self._build_sales_analysis, sales_data)
+
+    def create_inventory_analysis(self, inventory_data):
+        """Crea visualizaciones para el análisis de inventario (reutilizadas si los datos no han cambiado)"""
+        return self._cached_figure('inventory', self._build_inventory_analysis, inventory_data)
+
+    def _build_main_dashboard(self, sales_data, inventory_data, predictions_data):
         """Crea el dashboard principal con múltiples gráficos"""
         try:
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=(
-                    "Tendencia de Ventas y Predicción",
-                    "Ventas por Categoría",
-                    "Stock Actual por Categoría",
-                    "Rentabilidad por Categoría"
-                ),
-                vertical_spacing=0.12,
-                horizontal_spacing=0.1
-            )
+            # Sin ventas ni inventario no hay ningún gráfico que dibujar (la predicción depende de las ventas)
+            if sales_data.empty and inventory_data.empty:
+                return go.Figure()
+
+            fig = go.Figure(self._main_skeleton)
 
             # 1. Tendencia de Ventas y Predicción
             if not sales_data.empty:
-                # Datos históricos
+                # Datos históricos (una fila por venta: WebGL en lugar de SVG, reducidos con LTTB)
+                ventas_x, ventas_y = _downsample(
+                    _compact_dates(sales_data['fecha_venta']),
+                    sales_data['cantidad'].to_numpy(dtype=np.int32)
+                )
                 fig.add_trace(
-                    go.Scatter(
-                        x=sales_data['fecha_venta'],
-                        y=sales_data['cantidad'],
+                    go.Scattergl(
+                        x=ventas_x,
+                        y=ventas_y,
                         name="Ventas Reales",
                         line=dict(color="#1f77b4", width=2)
                     ),
@@ -44,8 +177,8 @@ class DashboardVisualizer:
                     # Predicción
                     fig.add_trace(
                         go.Scatter(
-                            x=predictions_data['ds'],
-                            y=predictions_data['yhat'],
+                            x=predictions_data['ds'].to_numpy(),
+                            y=predictions_data['yhat'].to_numpy(),
                             name="Predicción",
                             line=dict(color="#2ca02c", width=2, dash='dash')
                         ),
@@ -55,8 +188,8 @@ class DashboardVisualizer:
                     # Intervalo de confianza
                     fig.add_trace(
                         go.Scatter(
-                            x=predictions_data['ds'].tolist() + predictions_data['ds'].tolist()[::-1],
-                            y=predictions_data['yhat_upper'].tolist() + predictions_data['yhat_lower'].tolist()[::-1],
+                            x=np.concatenate([predictions_data['ds'].to_numpy(), predictions_data['ds'].to_numpy()[::-1]]),
+                            y=np.concatenate([predictions_data['yhat_upper'].to_numpy(), predictions_data['yhat_lower'].to_numpy()[::-1]]),
                             fill='toself',
                             fillcolor='rgba(0,176,246,0.2)',
                             line=dict(color='rgba(255,255,255,0)'),
@@ -66,13 +199,20 @@ class DashboardVisualizer:
                         row=1, col=1
                     )
 
+            # Cantidad y beneficio por categoría en una sola agregación (gráficos 2 y 4)
+            if not sales_data.empty:
+                por_categoria = sales_data.groupby('categoria', sort=True, observed=True).agg(
+                    cantidad=('cantidad', 'sum'),
+                    beneficio=('beneficio', 'sum')
+                ).reset_index()
+
             # 2. Ventas por Categoría
             if not sales_data.empty:
-                ventas_categoria = sales_data.groupby('categoria')['cantidad'].sum().reset_index()
+                ventas_categoria = por_categoria
                 fig.add_trace(
                     go.Bar(
-                        x=ventas_categoria['categoria'],
-                        y=ventas_categoria['cantidad'],
+                        x=ventas_categoria['categoria'].to_numpy(),
+                        y=ventas_categoria['cantidad'].to_numpy(),
                         name="Ventas por Categoría",
                         marker_color="#1f77b4"
                     ),
@@ -83,8 +223,8 @@ class DashboardVisualizer:
             if not inventory_data.empty:
                 fig.add_trace(
                     go.Bar(
-                        x=inventory_data['categoria'],
-                        y=inventory_data['stock_actual'],
+                        x=inventory_data['categoria'].to_numpy(),
+                        y=inventory_data['stock_actual'].to_numpy(),
                         name="Stock Actual",
                         marker_color="#2ca02c"
                     ),
@@ -93,11 +233,11 @@ class DashboardVisualizer:
 
             # 4. Rentabilidad por Categoría
             if not sales_data.empty:
-                rentabilidad = sales_data.groupby('categoria')['beneficio'].sum().reset_index()
+                rentabilidad = por_categoria
                 fig.add_trace(
                     go.Bar(
-                        x=rentabilidad['categoria'],
-                        y=rentabilidad['beneficio'],
+                        x=rentabilidad['categoria'].to_numpy(),
+                        y=rentabilidad['beneficio'].to_numpy(),
                         name="Rentabilidad",
                         marker_color="#ff7f0e"
                     ),
@@ -118,121 +258,21 @@ class DashboardVisualizer:
             logger.error(f"Error al crear dashboard: {str(e)}")
             return go.Figure()
 
+    def _build_sales_analysis(self, sales_data):
         """Crea visualizaciones para el análisis de ventas"""
         try:
             figures = {}
             
-            # 1. Tendencia temporal
-            fig_trend = go.Figure()
-            
-            for categoria in sales_data['categoria'].unique():
-                df_cat = sales_data[sales_data['categoria'] == categoria]
-                fig_trend.add_trace(
-                    go.Scatter(
-                        x=df_cat['fecha_venta'],
-                        y=df_cat['cantidad'],
-                        name=categoria,
-                        mode='lines'
-                    )
-                )
-            
-            fig_trend.update_layout(
-                title="Tendencia de Ventas por Categoría",
-                xaxis_title="Fecha",
-                yaxis_title="Cantidad",
-                template=self.theme
-            )
-            figures['trend'] = fig_trend
-
-            # 2. Distribución de ventas
-            fig_dist = go.Figure()
-            fig_dist.add_trace(
-                go.Box(
-                    x=sales_data['categoria'],
-                    y=sales_data['cantidad'],
-                    name="Distribución de Ventas"
-                )
-            )
-            fig_dist.update_layout(
-                title="Distribución de Ventas por Categoría",
-                xaxis_title="Categoría",
-                yaxis_title="Cantidad",
-                template=self.theme
-            )
-            figures['distribution'] = fig_dist
-
-            # 3. Análisis temporal
-            sales_data['mes'] = pd.to_datetime(sales_data['fecha_venta']).dt.month
-            ventas_mes = sales_data.groupby(['mes', 'categoria'])['cantidad'].mean().reset_index()
-            
-            fig_time = go.Figure()
-            for categoria in ventas_mes['categoria'].unique():
-                df_cat = ventas_mes[ventas_mes['categoria'] == categoria]
-                fig_time.add_trace(
-                    go.Scatter(
-                        x=df_cat['mes'],
-                        y=df_cat['cantidad'],
-                        name=categoria,
-                        mode='lines+markers'
-                    )
-                )
-            
-            fig_time.update_layout(
-                title="Patrón Temporal de Ventas",
-                xaxis_title="Mes",
-                yaxis_title="Cantidad Promedio",
-                template=self.theme
-            )
-            figures['temporal'] = fig_time
-
-            # 4. Análisis de rentabilidad
-            fig_profit = go.Figure(data=[
-                go.Scatter(
-                    x=sales_data['cantidad'],
-                    y=sales_data['beneficio'],
-                    mode='markers',
-                    marker=dict(
-                        size=8,
-                        color=sales_data['margen_porcentaje'],
-                        colorscale='RdYlBu',
-                        showscale=True
-                    ),
-                    text=sales_data['categoria'],
-                    name='Ventas vs Beneficio'
-                )
-            ])
-            
-            fig_profit.update_layout(
-                title="Análisis de Rentabilidad",
-                xaxis_title="Cantidad Vendida",
-                yaxis_title="Beneficio",
-                template=self.theme
-            )
-            figures['profit'] = fig_profit
-
-            return figures
-
-        except Exception as e:
-            logger.error(f"Error al crear análisis de ventas: {str(e)}")
-            return {'trend': go.Figure(), 'distribution': go.Figure(), 
-                    'temporal': go.Figure(), 'profit': go.Figure()}
-    def create_sales_analysis(self, sales_data):
-        """Crea visualizaciones para el análisis de ventas"""
-        try:
-            figures = {}
-            
-            # 1. Tendencia temporal
-            fig_trend = go.Figure()
-            for categoria in sales_data['categoria'].unique():
-                df_cat = sales_data[sales_data['categoria'] == categoria]
-                fig_trend.add_trace(
-                    go.Scatter(
-                        x=df_cat['fecha_venta'],
-                        y=df_cat['cantidad'],
-                        name=categoria,
-                        mode='lines+markers'
-                    )
+            # 1. Tendencia temporal (una fila por venta: WebGL en lugar de SVG, reducidos con LTTB)
+            # Trazas como dicts en una sola lista: la figura se valida una vez, no en cada add_trace
+            traces = []
+            for categoria, df_cat in sales_data.groupby('categoria', sort=False, observed=True):
+                x, y = _downsample(
+                    _compact_dates(df_cat['fecha_venta']),
+                    df_cat['cantidad'].to_numpy(dtype=np.int32)
                 )
+                traces.append(dict(type='scattergl', x=x, y=y, name=categoria, mode='lines+markers'))
+            fig_trend = go.Figure(data=traces)
             
             fig_trend.update_layout(
                 title="Tendencia de Ventas por Categoría",
@@ -246,8 +286,8 @@ class DashboardVisualizer:
             fig_dist = go.Figure()
             fig_dist.add_trace(
                 go.Box(
-                    x=sales_data['categoria'],
-                    y=sales_data['cantidad'],
+                    x=sales_data['categoria'].to_numpy(),
+                    y=sales_data['cantidad'].to_numpy(),
                     name="Distribución de Ventas"
                 )
             )
@@ -259,20 +299,21 @@ class DashboardVisualizer:
 
             # Solo crear el gráfico de estacionalidad si hay suficientes datos
             if len(sales_data) > 0:
-                sales_data['mes'] = pd.to_datetime(sales_data['fecha_venta']).dt.month
-                ventas_mes = sales_data.groupby(['mes', 'categoria'])['cantidad'].sum().reset_index()
+                # Mes como Series independiente: no se modifica el DataFrame del llamador
+                mes = DateHelper.to_datetime(sales_data['fecha_venta']).dt.month.rename('mes')
+                # Orden (mes, categoría) necesario para que las líneas se dibujen en orden temporal
+                ventas_mes = sales_data['cantidad'].groupby([mes, sales_data['categoria']], observed=True).sum().reset_index()
                 
-                fig_season = go.Figure()
-                for categoria in ventas_mes['categoria'].unique():
-                    df_cat = ventas_mes[ventas_mes['categoria'] == categoria]
-                    fig_season.add_trace(
-                        go.Scatter(
-                            x=df_cat['mes'],
-                            y=df_cat['cantidad'],
-                            name=categoria,
-                            mode='lines+markers'
-                        )
+                fig_season = go.Figure(data=[
+                    dict(
+                        type='scatter',
+                        x=df_cat['mes'].to_numpy(),
+                        y=df_cat['cantidad'].to_numpy(),
+                        name=categoria,
+                        mode='lines+markers'
                     )
+                    for categoria, df_cat in ventas_mes.groupby('categoria', sort=False, observed=True)
+                ])
                 
                 fig_season.update_layout(
                     title="Ventas Mensuales por Categoría",
@@ -292,7 +333,7 @@ class DashboardVisualizer:
                 'distribution': go.Figure(),
                 'seasonality': go.Figure()
             }
-    def create_inventory_analysis(self, inventory_data):
+    def _build_inventory_analysis(self, inventory_data):
         """Crea visualizaciones para el análisis de inventario"""
         try:
             figures = {}
@@ -300,8 +341,8 @@ class DashboardVisualizer:
             # 1. Distribución de stock
             fig_stock = go.Figure(data=[
                 go.Bar(
-                    x=inventory_data['categoria'],
-                    y=inventory_data['stock_actual'],
+                    x=inventory_data['categoria'].to_numpy(),
+                    y=inventory_data['stock_actual'].to_numpy(dtype=np.int32),
                     name='Stock Actual'
                 )
             ])
@@ -315,17 +356,21 @@ class DashboardVisualizer:
 
             # 2. Análisis de rotación
             if 'ventas_totales' in inventory_data.columns:
-                inventory_data['rotacion'] = inventory_data['ventas_totales'] / inventory_data['stock_actual'].replace(0, 1)
+                # Sobre arrays: sin copiar la columna de stock ni añadir columnas al DataFrame
+                stock = inventory_data['stock_actual'].to_numpy(dtype=np.int32)
+                # División en una pasada: donde no hay stock se conservan las ventas (divisor 1)
+                rotacion = inventory_data['ventas_totales'].to_numpy(dtype=np.float64, copy=True)
+                np.divide(rotacion, stock, out=rotacion, where=stock != 0)
                 
                 fig_rotation = go.Figure(data=[
                     go.Scatter(
-                        x=inventory_data['stock_actual'],
-                        y=inventory_data['rotacion'],
+                        x=stock,
+                        y=rotacion,
                         mode='markers',
-                        text=inventory_data['nombre'],
+                        text=inventory_data['nombre'].to_numpy(),
                         marker=dict(
                             size=10,
-                            color=inventory_data['valor_inventario'],
+                            color=inventory_data['valor_inventario'].to_numpy(dtype=np.float64),
                             colorscale='Viridis',
                             showscale=True
                         ),
@@ -344,8 +389,8 @@ class DashboardVisualizer:
             # 3. Valor del inventario
             fig_value = go.Figure(data=[
                 go.Bar(
-                    x=inventory_data['categoria'],
-                    y=inventory_data['valor_inventario'],
+                    x=inventory_data['categoria'].to_numpy(),
+                    y=inventory_data['valor_inventario'].to_numpy(),
                     name='Valor del Inventario'
                 )
             ])
@@ -365,30 +410,31 @@ class DashboardVisualizer:
 
 
     def create_performance_dashboard(self, performance_data):
+        """Crea dashboard de rendimiento (reutilizado si los datos no han cambiado)"""
+        return self._cached_figure('performance', self._build_performance_dashboard, performance_data)
+
+    def _build_performance_dashboard(self, performance_data):
         """Crea dashboard de rendimiento"""
         try:
             if performance_data.empty:
                 return go.Figure()
 
-            # Creamos el layout con subplots
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=(
-                    "Ventas vs Tiempo",
-                    "Distribución del Beneficio",
-                    "Rendimiento por Categoría",
-                    "Tendencia de Márgenes"
-                ),
-                vertical_spacing=0.12,
-                horizontal_spacing=0.1
-            )
+            # Creamos el layout con subplots (copia de la rejilla ya construida)
+            fig = go.Figure(self._perf_skeleton)
+
+            # Ingresos y margen medio por período en una sola agregación (gráficos 1 y 4)
+            # Orden por período necesario para las líneas temporales
+            por_periodo = performance_data.groupby('periodo', observed=True).agg(
+                ingresos_totales=('ingresos_totales', 'sum'),
+                margen_porcentaje=('margen_porcentaje', 'mean')
+            ).reset_index()
 
             # 1. Ventas vs Tiempo - Agregamos por período
-            ventas_tiempo = performance_data.groupby('periodo')['ingresos_totales'].sum().reset_index()
+            ventas_tiempo = por_periodo
             fig.add_trace(
                 go.Scatter(
-                    x=ventas_tiempo['periodo'],
-                    y=ventas_tiempo['ingresos_totales'],
+                    x=ventas_tiempo['periodo'].to_numpy(),
+                    y=ventas_tiempo['ingresos_totales'].to_numpy(),
                     name="Ingresos",
                     line=dict(color='blue')
                 ),
@@ -398,33 +444,30 @@ class DashboardVisualizer:
             # 2. Distribución del Beneficio
             fig.add_trace(
                 go.Box(
-                    y=performance_data['beneficio_total'],
+                    y=performance_data['beneficio_total'].to_numpy(),
                     name="Beneficio"
                 ),
                 row=1, col=2
             )
 
             # 3. Rendimiento por Categoría - Agregamos por categoría
-            cat_perf = performance_data.groupby('categoria').agg({
-                'ingresos_totales': 'sum',
-                'beneficio_total': 'sum'
-            }).reset_index()
+            cat_perf = performance_data.groupby('categoria', observed=True)['beneficio_total'].sum().reset_index()
             
             fig.add_trace(
                 go.Bar(
-                    x=cat_perf['categoria'],
-                    y=cat_perf['beneficio_total'],
+                    x=cat_perf['categoria'].to_numpy(),
+                    y=cat_perf['beneficio_total'].to_numpy(),
                     name="Beneficio por Categoría"
                 ),
                 row=2, col=1
             )
 
             # 4. Tendencia de Márgenes - Agregamos por período y calculamos promedio
-            margenes_tiempo = performance_data.groupby('periodo')['margen_porcentaje'].mean().reset_index()
+            margenes_tiempo = por_periodo
             fig.add_trace(
                 go.Scatter(
-                    x=margenes_tiempo['periodo'],
-                    y=margenes_tiempo['margen_porcentaje'],
+                    x=margenes_tiempo['periodo'].to_numpy(),
+                    y=margenes_tiempo['margen_porcentaje'].to_numpy(),
                     name="Margen Promedio",
                     line=dict(color='green')
                 ),
@@ -469,13 +512,16 @@ class DashboardVisualizer:
             go.Figure: Figura de Plotly con la visualización
         """
         try:
+            if historical_data.empty and forecast_data.empty:
+                return go.Figure()
+
             fig = go.Figure()
 
-            # Datos históricos
+            # Datos históricos (WebGL en lugar de SVG)
             fig.add_trace(
-                go.Scatter(
-                    x=historical_data['ds'],
-                    y=historical_data['y'],
+                go.Scattergl(
+                    x=historical_data['ds'].to_numpy(),
+                    y=historical_data['y'].to_numpy(dtype=np.float64),
                     name="Ventas Históricas",
                     mode='lines+markers',
                     line=dict(color='#1f77b4', width=1),
@@ -486,8 +532,8 @@ class DashboardVisualizer:
             # Predicción
             fig.add_trace(
                 go.Scatter(
-                    x=forecast_data['ds'],
-                    y=forecast_data['yhat'],
+                    x=forecast_data['ds'].to_numpy(),
+                    y=forecast_data['yhat'].to_numpy(),
                     name="Predicción",
                     mode='lines',
                     line=dict(color='#2ca02c', width=2, dash='dash')
@@ -497,8 +543,8 @@ class DashboardVisualizer:
             # Intervalo de confianza
             fig.add_trace(
                 go.Scatter(
-                    x=forecast_data['ds'].tolist() + forecast_data['ds'].tolist()[::-1],
-                    y=forecast_data['yhat_upper'].tolist() + forecast_data['yhat_lower'].tolist()[::-1],
+                    x=np.concatenate([forecast_data['ds'].to_numpy(), forecast_data['ds'].to_numpy()[::-1]]),
+                    y=np.concatenate([forecast_data['yhat_upper'].to_numpy(), forecast_data['yhat_lower'].to_numpy()[::-1]]),
                     fill='toself',
                     fillcolor='rgba(0,176,246,0.2)',
                     line=dict(color='rgba(255,255,255,0)'),